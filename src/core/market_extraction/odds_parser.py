@@ -1,9 +1,115 @@
+from collections.abc import Iterable, Iterator
 from datetime import UTC, datetime
+from functools import lru_cache
+import io
 import logging
 import re
 from typing import Any
 
-from bs4 import BeautifulSoup
+from lxml import etree, html
+
+# Shared parser for match pages: comments, processing instructions, whitespace-only text and the id index are
+# never read by the selectors below, so they are dropped while the tree is built.
+_HTML_PARSER = html.HTMLParser(remove_comments=True, remove_pis=True, remove_blank_text=True, collect_ids=False)
+
+# Pages larger than this are streamed with iterparse instead of being built into a full tree.
+_STREAMING_THRESHOLD_CHARS = 1_000_000
+
+
+def _has_class(name: str) -> str:
+    """Build an XPath predicate matching elements whose class attribute contains the exact token `name`."""
+    return f"contains(concat(' ', normalize-space(@class), ' '), ' {name} ')"
+
+
+_BOOKMAKER_BLOCK_XPATH = etree.XPath(f"//div[{_has_class('border-black-borders')}]")
+_ODDS_BLOCK_XPATH = etree.XPath(
+    f".//div[{_has_class('flex-center')} and {_has_class('flex-col')} and {_has_class('font-bold')}]"
+)
+# Every bookmaker name candidate of a block, in document order: logo titles, img alts and live-page links
+_BOOKMAKER_NAME_XPATH = etree.XPath(
+    f".//img[{_has_class('bookmaker-logo')}]/@title"
+    " | .//img/@alt"
+    f" | .//p[{_has_class('height-content')}]/descendant::a[1]"
+)
+_HEIGHT_CONTENT_XPATH = etree.XPath(f".//p[{_has_class('height-content')}]")
+
+_HISTORY_COLUMN = f"{_has_class('flex')} and {_has_class('flex-col')} and {_has_class('gap-1')}"
+# Odds history timestamps ("div.flex.flex-col.gap-1 > div.flex.gap-3 > div.font-normal") and the odds values of the
+# adjacent column ("div.flex.flex-col.gap-1 + div.flex.flex-col.gap-1 > div.font-bold"), in a single evaluation
+_ODDS_HISTORY_XPATH = etree.XPath(
+    f"//div[{_HISTORY_COLUMN}]/div[{_has_class('flex')} and {_has_class('gap-3')}]/div[{_has_class('font-normal')}]"
+    f" | //div[{_HISTORY_COLUMN}]/following-sibling::*[1][self::div and {_HISTORY_COLUMN}]"
+    f"/div[{_has_class('font-bold')}]"
+)
+_OPENING_BLOCK_XPATH = etree.XPath(f"//div[{_has_class('mt-2')} and {_has_class('gap-1')}]")
+_OPENING_ROW = f".//div[{_has_class('flex')} and {_has_class('gap-1')}]"
+# Opening odds timestamp candidates ("div.flex.gap-1 div") and values ("div.flex.gap-1 .font-bold") at any depth
+_OPENING_CELLS_XPATH = etree.XPath(f"{_OPENING_ROW}//div | {_OPENING_ROW}//*[{_has_class('font-bold')}]")
+
+# Characters that mark a live-page <p> as an odds value (numbers or +/-)
+_ODD_CHARS = frozenset("0123456789.+-")
+
+_MONTH_MAP = {
+    "Jan": 1, "Feb": 2, "Mar": 3, "Apr": 4, "May": 5, "Jun": 6,
+    "Jul": 7, "Aug": 8, "Sep": 9, "Oct": 10, "Nov": 11, "Dec": 12,
+}  # fmt: skip
+
+# Known bookmaker patterns to validate extracted names against
+_BOOKMAKER_PATTERNS = (
+    r"bet365", r"betmgm", r"fanduel", r"draftkings", r"caesars",
+    r"pointsbet", r"betrivers", r"unibet", r"william\s*hill", r"ladbrokes",
+    r"betfair", r"pinnacle", r"bovada", r"betonline", r"mybookie",
+    r"betway", r"888", r"bwin", r"betfred", r"paddy\s*power",
+    r"sportsbet", r"tab", r"neds", r"betsson", r"10bet",
+    r"1xbet", r"melbet", r"22bet", r"stake", r"cloudbet",
+)  # fmt: skip
+_BOOKMAKER_RE = re.compile("|".join(_BOOKMAKER_PATTERNS), re.IGNORECASE)
+# Heuristics: bookmaker names often contain common suffixes
+_SUFFIX_RE = re.compile(r"\.(?:com|us|uk|eu)|bet|book|wager", re.IGNORECASE)
+
+
+@lru_cache(maxsize=512)
+def _looks_like_bookmaker(name: str) -> bool:
+    """
+    Check if the name looks like a bookmaker.
+
+    Cached because the same few dozen bookmaker names are checked on every match page and every live poll.
+    """
+    if not name:
+        return False
+    return bool(_BOOKMAKER_RE.search(name) or _SUFFIX_RE.search(name))
+
+
+def _dedup(value: str) -> str:
+    """Collapse an odds value rendered twice in a row (e.g. "1.951.95" -> "1.95")."""
+    half = len(value) // 2
+    if len(value) % 2 == 0 and value[:half] == value[half:] and "." in value[:half]:
+        return value[:half]
+    return value
+
+
+def _parse_modal_timestamp(text: str, year: int) -> datetime:
+    """
+    Parse an odds history timestamp such as "10 Jun, 14:30" into a naive datetime of the given year.
+
+    Equivalent to strptime(text, "%d %b, %H:%M") for English month names, without strptime's locale lock and
+    format-string matching.
+
+    Raises:
+        ValueError: If the text does not match the expected format.
+    """
+    date_part, _, time_part = text.partition(", ")
+    day, _, month_name = date_part.partition(" ")
+    hour, _, minute = time_part.partition(":")
+    month = _MONTH_MAP.get(month_name.title())
+    if month is None:
+        raise ValueError(f"Unknown month in timestamp: {text!r}")
+    return datetime(year, month, int(day), int(hour), int(minute))
+
+
+def _text(element) -> str:
+    """Return the stripped, concatenated text of an lxml element (same as BeautifulSoup's get_text(strip=True))."""
+    return "".join(fragment.strip() for fragment in element.itertext())
 
 
 class OddsParser:
@@ -28,46 +134,64 @@ class OddsParser:
             list[dict]: A list of dictionaries containing bookmaker odds.
         """
         self.logger.info("Parsing odds from HTML content.")
-        soup = BeautifulSoup(html_content, "html.parser")
+        target_lower = target_bookmaker.lower() if target_bookmaker else None
 
-        # Try broader "border-black-borders" pattern first as it works better
-        bookmaker_blocks = soup.find_all("div", class_=re.compile(r"border-black-borders"))
+        if len(html_content) > _STREAMING_THRESHOLD_CHARS:
+            bookmaker_blocks = self._stream_bookmaker_blocks(html_content)
+        else:
+            bookmaker_blocks = self._find_bookmaker_blocks(html_content)
 
-        if not bookmaker_blocks:
-            # Fallback to broader selector
-            bookmaker_blocks = soup.find_all("div", class_=re.compile(r"^border-black-borders flex h-9"))
+        odds_data, block_count = self._parse_bookmaker_blocks(bookmaker_blocks, period, odds_labels, target_lower)
 
-        if not bookmaker_blocks:
+        if not block_count:
             self.logger.warning("No bookmaker blocks found.")
             return []
 
+        self.logger.info(f"Successfully parsed odds for {len(odds_data)} bookmakers.")
+        return odds_data
+
+    def _parse_bookmaker_blocks(
+        self, bookmaker_blocks: Iterable, period: str, odds_labels: list, target_lower: str | None
+    ) -> tuple[list[dict[str, Any]], int]:
+        """
+        Extracts the odds of each bookmaker block.
+
+        Args:
+            bookmaker_blocks (Iterable): The lxml elements of the bookmaker blocks.
+            period (str): The match period (e.g., "FullTime").
+            odds_labels (list): A list of labels defining the expected odds columns.
+            target_lower (str, optional): If set, the lowercased name of the only bookmaker to parse.
+
+        Returns:
+            tuple[list[dict], int]: The bookmaker odds and the number of blocks that were visited.
+        """
+        label_count = len(odds_labels)
         odds_data = []
+        block_count = 0
         for block in bookmaker_blocks:
+            block_count += 1
             try:
                 bookmaker_name = self._extract_bookmaker_name(block)
 
                 if not bookmaker_name or bookmaker_name == "Unknown":
                     continue
 
-                if target_bookmaker and bookmaker_name.lower() != target_bookmaker.lower():
+                # Filter on the name before touching the odds cells of bookmakers we are going to discard
+                if target_lower and bookmaker_name.lower() != target_lower:
                     continue
 
-                odds_blocks = block.find_all("div", class_=re.compile(r"flex-center.*flex-col.*font-bold"))
+                odds_texts = [_text(b) for b in _ODDS_BLOCK_XPATH(block)]
 
                 # Also try alternative odds selectors for live pages
-                if len(odds_blocks) < len(odds_labels):
-                    odds_blocks = block.find_all("p", class_=re.compile(r"height-content"))
-                    # Filter to only elements that look like odds (contain numbers or +/-)
-                    odds_blocks = [b for b in odds_blocks if re.search(r"[\d.+-]", b.get_text(strip=True))]
+                if len(odds_texts) < label_count:
+                    # Keep only elements that look like odds (contain numbers or +/-), reading each text once
+                    odds_texts = [t for t in map(_text, _HEIGHT_CONTENT_XPATH(block)) if not _ODD_CHARS.isdisjoint(t)]
 
-                if len(odds_blocks) < len(odds_labels):
+                if len(odds_texts) < label_count:
                     self.logger.warning(f"Incomplete odds data for bookmaker: {bookmaker_name}. Skipping...")
                     continue
 
-                extracted_odds = {label: odds_blocks[i].get_text(strip=True) for i, label in enumerate(odds_labels)}
-
-                for key, value in extracted_odds.items():
-                    extracted_odds[key] = re.sub(r"(\d+\.\d+)\1", r"\1", value)
+                extracted_odds = {label: _dedup(text) for label, text in zip(odds_labels, odds_texts, strict=False)}
 
                 extracted_odds["bookmaker_name"] = bookmaker_name
                 extracted_odds["period"] = period
@@ -77,8 +201,69 @@ class OddsParser:
                 self.logger.error(f"Error parsing odds: {e}")
                 continue
 
-        self.logger.info(f"Successfully parsed odds for {len(odds_data)} bookmakers.")
-        return odds_data
+        return odds_data, block_count
+
+    def _find_bookmaker_blocks(self, html_content: str) -> list:
+        """
+        Build the full tree of a match page and return its bookmaker blocks.
+
+        Args:
+            html_content (str): The HTML content of the page.
+
+        Returns:
+            list: The lxml elements of the bookmaker blocks, empty if the page could not be parsed.
+        """
+        try:
+            tree = html.fromstring(html_content, parser=_HTML_PARSER)
+        except etree.ParserError:
+            return []
+
+        return _BOOKMAKER_BLOCK_XPATH(tree)
+
+    def _stream_bookmaker_blocks(self, html_content: str) -> Iterator:
+        """
+        Stream the bookmaker blocks of a large match page without keeping the rest of the tree in memory.
+
+        Each block is yielded once its subtree is complete. Once the caller is done with it, the block and
+        every finished element outside of a bookmaker block are cleared and detached, so peak memory stays
+        close to the size of a single block rather than the whole page.
+
+        Args:
+            html_content (str): The HTML content of the page.
+
+        Yields:
+            The lxml element of each bookmaker block, in document order.
+        """
+        context = etree.iterparse(
+            io.BytesIO(html_content.encode("utf-8")),
+            events=("start", "end"),
+            tag="div",
+            html=True,
+            encoding="utf-8",
+            remove_comments=True,
+            remove_pis=True,
+            remove_blank_text=True,
+            collect_ids=False,
+        )
+        block_depth = 0
+        try:
+            for event, elem in context:
+                is_block = "border-black-borders" in elem.get("class", "").split()
+                if event == "start":
+                    block_depth += is_block
+                    continue
+
+                if is_block:
+                    block_depth -= 1
+                    yield elem
+
+                # Elements inside a block are still needed until the enclosing block has been yielded
+                if block_depth == 0:
+                    elem.clear(keep_tail=True)
+                    while elem.getprevious() is not None:
+                        del elem.getparent()[0]
+        except etree.XMLSyntaxError as e:
+            self.logger.warning(f"Streaming parse of match page stopped early: {e}")
 
     def _extract_bookmaker_name(self, block) -> str:
         """
@@ -86,56 +271,35 @@ class OddsParser:
         Handles both pre-match (img.bookmaker-logo) and live page (p/a text) structures.
 
         Args:
-            block: BeautifulSoup element containing bookmaker info.
+            block: lxml element containing bookmaker info.
 
         Returns:
             str: Bookmaker name or "Unknown" if not found.
         """
-        # Known bookmaker patterns to validate against
-        bookmaker_patterns = [
-            r"bet365", r"betmgm", r"fanduel", r"draftkings", r"caesars",
-            r"pointsbet", r"betrivers", r"unibet", r"william\s*hill", r"ladbrokes",
-            r"betfair", r"pinnacle", r"bovada", r"betonline", r"mybookie",
-            r"betway", r"888", r"bwin", r"betfred", r"paddy\s*power",
-            r"sportsbet", r"tab", r"neds", r"betsson", r"10bet",
-            r"1xbet", r"melbet", r"22bet", r"stake", r"cloudbet",
-        ]
-
-        def looks_like_bookmaker(name: str) -> bool:
-            """Check if the name looks like a bookmaker."""
-            if not name:
-                return False
-            name_lower = name.lower()
-            # Check against known patterns
-            for pattern in bookmaker_patterns:
-                if re.search(pattern, name_lower):
-                    return True
-            # Heuristics: bookmaker names often end with common suffixes
-            if any(suffix in name_lower for suffix in [".com", ".us", ".uk", ".eu", "bet", "book", "wager"]):
-                return True
-            return False
-
-        # Method 1: img.bookmaker-logo with title attribute (pre-match pages)
-        img_tag = block.find("img", class_="bookmaker-logo")
-        if img_tag and "title" in img_tag.attrs:
-            return img_tag["title"]
-
-        # Method 2: img with alt attribute containing bookmaker name
-        for img_tag in block.find_all("img", alt=True):
-            alt_text = img_tag.get("alt", "")
-            if alt_text and looks_like_bookmaker(alt_text):
-                return alt_text
-
-        # Method 3: Link with bookmaker name (live pages)
-        # Look for <p class="height-content"><a>bookmaker_name</a></p>
-        p_tags = block.find_all("p", class_=re.compile(r"height-content"))
-        for p in p_tags:
-            a_tag = p.find("a")
-            if a_tag:
-                name = a_tag.get_text(strip=True)
-                # Verify it looks like a bookmaker name
-                if name and looks_like_bookmaker(name):
+
+        # All candidates come from a single XPath evaluation in document order, so the priority of the
+        # methods below is restored while walking the results
+        alt_name = link_name = None
+        for candidate in _BOOKMAKER_NAME_XPATH(block):
+            if isinstance(candidate, str):
+                # Plain str: XPath smart strings keep their whole tree alive, including as cache keys
+                name = str(candidate)
+                # Method 1: img.bookmaker-logo with title attribute (pre-match pages)
+                if candidate.attrname == "title":
                     return name
+                # Method 2: img with alt attribute containing bookmaker name
+                if alt_name is None and _looks_like_bookmaker(name):
+                    alt_name = name
+            elif link_name is None:
+                # Method 3: Link with bookmaker name (live pages)
+                # Look for <p class="height-content"><a>bookmaker_name</a></p>
+                name = _text(candidate)
+                # Verify it looks like a bookmaker name
+                if _looks_like_bookmaker(name):
+                    link_name = name
+
+        if alt_name or link_name:
+            return alt_name or link_name
 
         # Method 4: No fallback - if we can't identify a known bookmaker, return Unknown
         # This is safer than guessing and potentially returning team names
@@ -152,36 +316,43 @@ class OddsParser:
             dict: Parsed odds history data, including historical odds and the opening odds.
         """
         self.logger.info("Parsing modal content for odds history.")
-        soup = BeautifulSoup(modal_html, "html.parser")
 
         try:
+            tree = html.fromstring(modal_html, parser=_HTML_PARSER)
             odds_history = []
-            timestamps = soup.select("div.flex.flex-col.gap-1 > div.flex.gap-3 > div.font-normal")
-            odds_values = soup.select("div.flex.flex-col.gap-1 + div.flex.flex-col.gap-1 > div.font-bold")
+            # Timestamps and values live in two sibling columns, so document order lists every timestamp first
+            history_cells = _ODDS_HISTORY_XPATH(tree)
+            timestamps = [cell for cell in history_cells if "font-normal" in cell.get("class", "").split()]
+            odds_values = [cell for cell in history_cells if "font-normal" not in cell.get("class", "").split()]
+            # Modal timestamps carry no year; resolve it once rather than per row
+            current_year = datetime.now(UTC).year
 
             for ts, odd in zip(timestamps, odds_values, strict=False):
-                time_text = ts.get_text(strip=True)
+                time_text = _text(ts)
                 try:
-                    dt = datetime.strptime(time_text, "%d %b, %H:%M")
-                    formatted_time = dt.replace(year=datetime.now(UTC).year).isoformat()
+                    formatted_time = _parse_modal_timestamp(time_text, current_year).isoformat()
                 except ValueError:
                     self.logger.warning(f"Failed to parse datetime: {time_text}")
                     continue
 
-                odds_history.append({"timestamp": formatted_time, "odds": float(odd.get_text(strip=True))})
+                odds_history.append({"timestamp": formatted_time, "odds": float(_text(odd))})
 
             # Parse opening odds
-            opening_odds_block = soup.select_one("div.mt-2.gap-1")
-            opening_ts_div = opening_odds_block.select_one("div.flex.gap-1 div")
-            opening_val_div = opening_odds_block.select_one("div.flex.gap-1 .font-bold")
+            opening_odds_block = _OPENING_BLOCK_XPATH(tree)[0]
+            # Timestamp and value candidates come back from a single walk, in document order
+            opening_cells = _OPENING_CELLS_XPATH(opening_odds_block)
+            opening_ts_div = next((cell for cell in opening_cells if cell.tag == "div"), None)
+            opening_val_div = next(
+                (cell for cell in opening_cells if "font-bold" in cell.get("class", "").split()), None
+            )
 
             opening_odds = None
-            if opening_ts_div and opening_val_div:
+            if opening_ts_div is not None and opening_val_div is not None:
                 try:
-                    dt = datetime.strptime(opening_ts_div.get_text(strip=True), "%d %b, %H:%M")
+                    opening_dt = _parse_modal_timestamp(_text(opening_ts_div), current_year)
                     opening_odds = {
-                        "timestamp": dt.replace(year=datetime.now(UTC).year).isoformat(),
-                        "odds": float(opening_val_div.get_text(strip=True)),
+                        "timestamp": opening_dt.isoformat(),
+                        "odds": float(_text(opening_val_div)),
                     }
                 except ValueError:
                     self.logger.warning("Failed to parse opening odds timestamp.")
@@ -145,6 +145,28 @@ class TestOddsParser:
         assert len(result) == 1
         assert result[0]["1"] == "1.90"  # Duplicate should be removed
 
+    def test_parse_market_odds_keeps_non_decimal_repeats(self, odds_parser):
+        """Test that only doubled decimal odds are collapsed, not values that merely repeat digits."""
+        # Arrange
+        html_with_repeats = """
+        <div class="border-black-borders flex h-9">
+            <img class="bookmaker-logo" title="Bookmaker1">
+            <div class="flex-center flex-col font-bold">11.5011.50</div>
+            <div class="flex-center flex-col font-bold">1010</div>
+            <div class="flex-center flex-col font-bold">1.50</div>
+        </div>
+        """
+        odds_labels = ["1", "X", "2"]
+
+        # Act
+        result = odds_parser.parse_market_odds(html_with_repeats, "FullTime", odds_labels)
+
+        # Assert
+        assert len(result) == 1
+        assert result[0]["1"] == "11.50"
+        assert result[0]["X"] == "1010"
+        assert result[0]["2"] == "1.50"
+
     def test_parse_market_odds_fallback_selector(self, odds_parser):
         """Test parsing with fallback selector when primary selector fails."""
         # Arrange
@@ -164,6 +186,118 @@ class TestOddsParser:
         assert len(result) == 1
         assert result[0]["bookmaker_name"] == "Bookmaker1"
 
+    def test_parse_market_odds_live_page_structure(self, odds_parser):
+        """Test parsing of live pages where the bookmaker name and odds are plain <p> tags."""
+        # Arrange
+        live_html = """
+        <div class="border-black-borders flex h-9">
+            <p class="height-content"><a href="/bookmaker/pinnacle/"> Pinnacle </a></p>
+            <p class="height-content">1.80</p>
+            <p class="height-content">2.05</p>
+        </div>
+        """
+        odds_labels = ["1", "2"]
+
+        # Act
+        result = odds_parser.parse_market_odds(live_html, "FullTime", odds_labels)
+
+        # Assert
+        assert len(result) == 1
+        assert result[0]["bookmaker_name"] == "Pinnacle"
+        assert result[0]["1"] == "1.80"
+        assert result[0]["2"] == "2.05"
+
+    def test_parse_market_odds_matches_whole_class_tokens(self, odds_parser):
+        """Test that odds cells are matched on class tokens, regardless of their order."""
+        # Arrange
+        html_with_reordered_classes = """
+        <div class="border-black-borders flex h-9">
+            <img class="bookmaker-logo" title="Bookmaker1">
+            <div class="flex-center flex-col font-bold-muted">9.99</div>
+            <div class="font-bold flex-col flex-center">1.90</div>
+            <div class="flex-center font-bold">8.88</div>
+            <div class="flex flex-center flex-col font-bold">3.50</div>
+        </div>
+        """
+        odds_labels = ["1", "X"]
+
+        # Act
+        result = odds_parser.parse_market_odds(html_with_reordered_classes, "FullTime", odds_labels)
+
+        # Assert
+        assert len(result) == 1
+        assert result[0]["1"] == "1.90"
+        assert result[0]["X"] == "3.50"
+
+    def test_extract_bookmaker_name_from_img_alt(self, odds_parser):
+        """Test that img alt texts are only accepted when they look like a bookmaker."""
+        # Arrange
+        html_with_alts = """
+        <div class="border-black-borders flex h-9">
+            <img alt="Arsenal">
+            <img alt="William Hill">
+            <div class="flex-center flex-col font-bold">1.90</div>
+        </div>
+        <div class="border-black-borders flex h-9">
+            <img alt="Chelsea">
+            <div class="flex-center flex-col font-bold">2.10</div>
+        </div>
+        """
+
+        # Act
+        result = odds_parser.parse_market_odds(html_with_alts, "FullTime", ["1"])
+
+        # Assert
+        assert len(result) == 1
+        assert result[0]["bookmaker_name"] == "William Hill"
+        assert result[0]["1"] == "1.90"
+
+    def test_parse_market_odds_streaming_large_page(self, odds_parser):
+        """Test that large pages are streamed and yield the same odds as the in-memory parse."""
+        # Arrange
+        odds_labels = ["1", "X", "2"]
+        page_html = f"<html><body><div class='header'><div>Match</div></div>{self.SAMPLE_HTML_ODDS}</body></html>"
+        expected = odds_parser.parse_market_odds(page_html, "FullTime", odds_labels)
+
+        # Act
+        with patch("src.core.market_extraction.odds_parser._STREAMING_THRESHOLD_CHARS", 0):
+            with patch.object(odds_parser, "_find_bookmaker_blocks") as mock_find:
+                result = odds_parser.parse_market_odds(page_html, "FullTime", odds_labels)
+
+        # Assert
+        mock_find.assert_not_called()
+        assert len(result) == 2
+        assert result == expected
+
+    def test_parse_market_odds_streaming_no_bookmakers(self, odds_parser):
+        """Test that streaming a page without bookmaker blocks returns an empty list."""
+        # Arrange
+        with patch("src.core.market_extraction.odds_parser._STREAMING_THRESHOLD_CHARS", 0):
+            # Act
+            result = odds_parser.parse_market_odds("<div>No bookmakers found</div>", "FullTime", ["1", "X", "2"])
+
+        # Assert
+        assert result == []
+
+    def test_extract_bookmaker_name_prefers_logo_title(self, odds_parser):
+        """Test that the logo title wins over img alts and links that appear before it in the block."""
+        # Arrange
+        html_with_candidates = """
+        <div class="border-black-borders flex h-9">
+            <p class="height-content"><a>Pinnacle</a></p>
+            <img alt="bet365 promo">
+            <img class="bookmaker-logo" alt="logo" title="Bookmaker1">
+            <div class="flex-center flex-col font-bold">1.90</div>
+        </div>
+        """
+
+        # Act
+        result = odds_parser.parse_market_odds(html_with_candidates, "FullTime", ["1"])
+
+        # Assert
+        assert len(result) == 1
+        assert result[0]["bookmaker_name"] == "Bookmaker1"
+
     def test_parse_odds_history_modal_success(self, odds_parser):
         """Test successful parsing of odds history modal."""
         # Arrange
@@ -171,9 +305,7 @@ class TestOddsParser:
             mock_now = MagicMock()
             mock_now.year = 2025
             mock_datetime.now.return_value = mock_now
-            mock_datetime.strptime.side_effect = lambda *args, **kwargs: __import__("datetime").datetime.strptime(
-                *args, **kwargs
-            )
+            mock_datetime.side_effect = lambda *args, **kwargs: __import__("datetime").datetime(*args, **kwargs)
 
             # Act
             result = odds_parser.parse_odds_history_modal(self.SAMPLE_HTML_ODDS_HISTORY)
@@ -182,8 +314,22 @@ class TestOddsParser:
             assert "odds_history" in result
             assert len(result["odds_history"]) == 2
             assert result["odds_history"][0]["odds"] == 1.95
+            assert result["odds_history"][0]["timestamp"] == "2025-06-10T14:30:00"
             assert result["odds_history"][1]["odds"] == 1.90
             assert "opening_odds" in result
+            assert result["opening_odds"]["timestamp"] == "2025-06-10T08:00:00"
+            assert result["opening_odds"]["odds"] == 1.85
+            mock_datetime.now.assert_called_once()
+
+            # Act: a label element precedes the opening odds timestamp
+            labelled_html = self.SAMPLE_HTML_ODDS_HISTORY.replace(
+                "<div>10 Jun, 08:00</div>", "<span>Opening odds:</span><div>10 Jun, 08:00</div>"
+            )
+            labelled_result = odds_parser.parse_odds_history_modal(labelled_html)
+
+            # Assert
+            assert labelled_result["opening_odds"]["timestamp"] == "2025-06-10T08:00:00"
+            assert labelled_result["opening_odds"]["odds"] == 1.85
 
     def test_parse_odds_history_modal_invalid_html(self, odds_parser):
         """Test parsing odds history from invalid HTML."""
@@ -192,9 +338,7 @@ class TestOddsParser:
             mock_now = MagicMock()
             mock_now.year = 2025
             mock_datetime.now.return_value = mock_now
-            mock_datetime.strptime.side_effect = lambda *args, **kwargs: __import__("datetime").datetime.strptime(
-                *args, **kwargs
-            )
+            mock_datetime.side_effect = lambda *args, **kwargs: __import__("datetime").datetime(*args, **kwargs)
 
             # Act
             invalid_html = "<div>Invalid HTML content</div>"
@@ -210,11 +354,13 @@ class TestOddsParser:
             mock_now = MagicMock()
             mock_now.year = 2025
             mock_datetime.now.return_value = mock_now
-            # Force ValueError on strptime
-            mock_datetime.strptime.side_effect = ValueError("Invalid date format")
+            mock_datetime.side_effect = lambda *args, **kwargs: __import__("datetime").datetime(*args, **kwargs)
 
             # Act
-            result = odds_parser.parse_odds_history_modal(self.SAMPLE_HTML_ODDS_HISTORY)
+            invalid_dates_html = self.SAMPLE_HTML_ODDS_HISTORY.replace("10 Jun, 14:30", "Jun 10 14h30").replace(
+                "10 Jun, 12:00", "10 Foo, 12:00"
+            )
+            result = odds_parser.parse_odds_history_modal(invalid_dates_html)
 
             # Assert
             assert "odds_history" in result
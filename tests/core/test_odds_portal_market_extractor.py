@@ -155,7 +155,7 @@ class TestOddsPortalMarketExtractor:
             mock_now = MagicMock()
             mock_now.year = 2025
             mock_datetime.now.return_value = mock_now
-            mock_datetime.strptime.side_effect = lambda *args, **kwargs: datetime.strptime(*args, **kwargs)
+            mock_datetime.side_effect = lambda *args, **kwargs: datetime(*args, **kwargs)
 
             # Act
             result = extractor.odds_parser.parse_odds_history_modal(SAMPLE_HTML_ODDS_HISTORY)
@@ -177,7 +177,7 @@ class TestOddsPortalMarketExtractor:
             mock_now = MagicMock()
             mock_now.year = 2025
             mock_datetime.now.return_value = mock_now
-            mock_datetime.strptime.side_effect = lambda *args, **kwargs: datetime.strptime(*args, **kwargs)
+            mock_datetime.side_effect = lambda *args, **kwargs: datetime(*args, **kwargs)
 
             # Act
             invalid_html = "<div>Invalid HTML content</div>"
@@ -193,11 +193,13 @@ class TestOddsPortalMarketExtractor:
             mock_now = MagicMock()
             mock_now.year = 2025
             mock_datetime.now.return_value = mock_now
-            # Force ValueError on strptime
-            mock_datetime.strptime.side_effect = ValueError("Invalid date format")
+            mock_datetime.side_effect = lambda *args, **kwargs: datetime(*args, **kwargs)
 
             # Act
-            result = extractor.odds_parser.parse_odds_history_modal(SAMPLE_HTML_ODDS_HISTORY)
+            invalid_dates_html = SAMPLE_HTML_ODDS_HISTORY.replace("10 Jun, 14:30", "Jun 10 14h30").replace(
+                "10 Jun, 12:00", "10 Foo, 12:00"
+            )
+            result = extractor.odds_parser.parse_odds_history_modal(invalid_dates_html)
 
             # Assert
             assert "odds_history" in result